@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from sound_generator import EFFECTS, SAMPLE_RATE, render_tones, to_pcm, write_pcm
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def find_encoder(fmt):
+    """Return the name of an available OGG encoder, or None for WAV output."""
+    if fmt == 'wav':
+        return None
+    for encoder in ('ffmpeg', 'oggenc'):
+        if shutil.which(encoder):
+            return encoder
+    if fmt == 'ogg':
+        raise SystemExit("No OGG encoder found (install ffmpeg or vorbis-tools)")
+    return None
+
+def fingerprint(name, tones, sample_rate, encoder):
+    description = json.dumps({
+        'name': name,
+        'tones': [list(tone) for tone in tones],
+        'sample_rate': sample_rate,
+        'encoder': encoder,
+    }, sort_keys=True)
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+def encode_command(encoder, wav_path, ogg_path):
+    if encoder == 'ffmpeg':
+        return ['ffmpeg', '-y', '-loglevel', 'error', '-i', wav_path,
+                '-c:a', 'libvorbis', '-q:a', '4', ogg_path]
+    return ['oggenc', '-Q', '-q', '4', '-o', ogg_path, wav_path]
+
+def build_effect(name, tones, directory, sample_rate, encoder):
+    """Render (and optionally encode) one effect; runs in a worker process."""
+    pcm = to_pcm(render_tones(tones, sample_rate))
+    wav_path = os.path.join(directory, f"{name}.wav")
+    temp_wav = os.path.join(directory, f".{name}.{os.getpid()}.wav")
+    write_pcm(pcm, temp_wav, sample_rate)
+
+    if encoder is None:
+        os.replace(temp_wav, wav_path)
+        filename = f"{name}.wav"
+    else:
+        temp_ogg = os.path.join(directory, f".{name}.{os.getpid()}.ogg")
+        try:
+            subprocess.run(encode_command(encoder, temp_wav, temp_ogg), check=True)
+            os.replace(temp_ogg, os.path.join(directory, f"{name}.ogg"))
+        finally:
+            for path in (temp_wav, temp_ogg):
+                if os.path.exists(path):
+                    os.remove(path)
+        # The OGG supersedes any WAV left over from earlier builds
+        if os.path.exists(wav_path):
+            os.remove(wav_path)
+        filename = f"{name}.ogg"
+
+    return name, {
+        'file': filename,
+        'fingerprint': fingerprint(name, tones, sample_rate, encoder),
+        'samples': int(pcm.size),
+    }
+
+def load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'sounds': {}}
+
+def save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(temp_path, path)
+
+def build_assets(directory=ASSETS_DIR, effects=EFFECTS, sample_rate=SAMPLE_RATE,
+                 fmt='auto', jobs=None, force=False):
+    """Bring every effect in `directory` up to date and rewrite the manifest.
+
+    Effects whose fingerprint and output file match the previous manifest
+    are skipped; the rest are rendered in a process pool. Files the previous
+    manifest listed that are no longer produced are removed as stale.
+    Returns (built, skipped, removed) name lists.
+    """
+    os.makedirs(directory, exist_ok=True)
+    encoder = find_encoder(fmt)
+    previous = load_manifest(directory)['sounds']
+
+    sounds = {}
+    pending = []
+    for name, tones in effects.items():
+        entry = previous.get(name)
+        if (not force and entry is not None
+                and entry['fingerprint'] == fingerprint(name, tones, sample_rate, encoder)
+                and os.path.exists(os.path.join(directory, entry['file']))):
+            sounds[name] = entry
+        else:
+            pending.append(name)
+    skipped = [name for name in effects if name not in pending]
+
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(build_effect, name, effects[name], directory, sample_rate, encoder)
+                       for name in pending]
+            results = [future.result() for future in futures]
+    else:
+        results = [build_effect(name, effects[name], directory, sample_rate, encoder)
+                   for name in pending]
+    sounds.update(results)
+
+    removed = []
+    current = {entry['file'] for entry in sounds.values()}
+    for name, entry in previous.items():
+        path = os.path.join(directory, entry['file'])
+        if entry['file'] not in current and os.path.exists(path):
+            os.remove(path)
+            removed.append(entry['file'])
+
+    save_manifest(directory, {
+        'version': MANIFEST_VERSION,
+        'sample_rate': sample_rate,
+        'sounds': {name: sounds[name] for name in effects},
+    })
+    return pending, skipped, removed
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the web sound assets and manifest.")
+    parser.add_argument('--assets', default=ASSETS_DIR, help="output directory")
+    parser.add_argument('--format', choices=['auto', 'ogg', 'wav'], default='auto',
+                        help="auto encodes OGG when ffmpeg or oggenc is available")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes")
+    parser.add_argument('--force', action='store_true', help="rebuild everything")
+    args = parser.parse_args()
+
+    built, skipped, removed = build_assets(args.assets, fmt=args.format,
+                                           jobs=args.jobs, force=args.force)
+    print(f"Built {len(built)} ({', '.join(built) or '-'}), "
+          f"skipped {len(skipped)} unchanged, removed {len(removed)} stale")
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 import asyncio
 import pygame
 import random
+import collections
+import json
 import math
 import os
+import sys
+import time
 import numpy
 
 # Initialize Pygame
@@ -24,14 +28,142 @@ BROWN = (139, 69, 19)
 LIGHT_GREEN = (144, 238, 144)
 SKIN_COLOR = (255, 218, 185)
 
+PARTICLE_COLORS = [YELLOW, GREEN, BLUE, RED]
+
+class TextCache:
+    """Font registry plus an LRU cache of rendered text surfaces.
+
+    Fonts are created once per size, and rendered surfaces are reused
+    while the same (text, size, colour) keeps being drawn. Hit, miss and
+    eviction counts and the pixel memory held are tracked for tuning.
+    """
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._fonts = {}
+        self._surfaces = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory_bytes = 0
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self._fonts[size] = font
+        return font
+
+    def render(self, text, size, color, antialias=True):
+        key = (text, size, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font(size).render(text, antialias, color)
+        self._surfaces[key] = surface
+        self.memory_bytes += surface.get_pitch() * surface.get_height()
+        while len(self._surfaces) > self.max_entries:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.memory_bytes -= evicted.get_pitch() * evicted.get_height()
+            self.evictions += 1
+        return surface
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'entries': len(self._surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+            'memory_bytes': self.memory_bytes,
+        }
+
+    def clear(self):
+        self._surfaces.clear()
+        self.memory_bytes = 0
+
+text_cache = TextCache()
+
+class DirtyRectTracker:
+    """Tracks which parts of the screen changed since the last present().
+
+    Moving things report their bounds with add(); those rects are also
+    refreshed on the following frame so the pixels they vacate get
+    updated. Static regions such as HUD text report their content with
+    mark() and are only refreshed when that content changes. present()
+    calls pygame.display.update() with the dirty rects, falling back to a
+    full flip when a full redraw was requested with invalidate() or the
+    dirty area exceeds full_threshold of the screen.
+    """
+    def __init__(self, size, full_threshold=0.4):
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.full_threshold = full_threshold
+        self.rects = []
+        self.moving = []
+        self.previous = []
+        self.regions = {}
+        self.full = True
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.last_area = 0
+
+    def add(self, rect):
+        """Report the bounds of something moving this frame."""
+        rect = self.screen_rect.clip(rect)
+        if rect.width and rect.height:
+            self.moving.append(rect)
+
+    def mark(self, key, content, rect):
+        """Report a static region; it is refreshed only when content changes."""
+        rect = pygame.Rect(rect)
+        previous = self.regions.get(key)
+        if previous is not None and previous[0] == content:
+            return
+        if previous is not None:
+            self.rects.append(previous[1])
+        self.rects.append(rect)
+        self.regions[key] = (content, rect)
+
+    def invalidate(self):
+        """Force the next present() to update the whole screen."""
+        self.full = True
+
+    def resize(self, size):
+        if self.screen_rect.size != tuple(size):
+            self.screen_rect = pygame.Rect((0, 0), size)
+            self.invalidate()
+
+    def present(self):
+        dirty = self.previous + self.moving + self.rects
+        area = sum(rect.width * rect.height for rect in dirty)
+        self.last_area = area
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        if self.full or area > self.full_threshold * screen_area:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+        self.full = False
+        self.previous = self.moving
+        self.moving = []
+        self.rects = []
+
 class Wall:
-    def __init__(self, x, y, width, height, is_vertical=True):
+    def __init__(self, x, y, width, height, is_vertical=True, rng=random):
         self.x = x
         self.y = y
         self.width = width
         self.height = height
         self.is_vertical = is_vertical
-        self.is_l_shaped = random.choice([True, False])
+        self.is_l_shaped = rng.choice([True, False])
         
         # For L-shaped walls, create two rectangles
         if self.is_l_shaped:
@@ -68,19 +200,156 @@ class Wall:
             return True
         return False
 
+class WallGrid:
+    """Wall occupancy bitmap with a summed-area table, for spawn sampling."""
+    def __init__(self, walls, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.width = width
+        self.height = height
+        occupancy = numpy.zeros((height, width), dtype=numpy.uint8)
+        for wall in walls:
+            for rect in (wall.rect1, wall.rect2):
+                if rect is not None:
+                    rect = rect.clip(pygame.Rect(0, 0, width, height))
+                    occupancy[rect.top:rect.bottom, rect.left:rect.right] = 1
+        self.sat = numpy.zeros((height + 1, width + 1), dtype=numpy.int32)
+        self.sat[1:, 1:] = occupancy.cumsum(axis=0, dtype=numpy.int32).cumsum(axis=1)
+        self.free_cache = {}
+
+    def free_mask(self, width, height, region=None):
+        """Top-left corners where a width x height rect fits on screen clear of walls.
+
+        The free space eroded by the footprint, limited to region (a rect of
+        allowed corners). Returns (mask, x0, y0), where mask[y, x] covers
+        the corner (x0 + x, y0 + y).
+        """
+        bounds = pygame.Rect(0, 0, self.width - width + 1, self.height - height + 1)
+        if region is not None:
+            bounds = bounds.clip(region)
+        top, left = bounds.top, bounds.left
+        bottom, right = bounds.bottom, bounds.right
+        sat = self.sat
+        total = (sat[top + height:bottom + height, left + width:right + width]
+                 - sat[top:bottom, left + width:right + width]
+                 - sat[top + height:bottom + height, left:right]
+                 + sat[top:bottom, left:right])
+        return total == 0, left, top
+
+    def free_positions(self, width, height, region=None):
+        """Cached flat indices of free_mask(); returns (indices, columns, x0, y0)."""
+        key = (width, height, None if region is None else tuple(region))
+        free = self.free_cache.get(key)
+        if free is None:
+            mask, x0, y0 = self.free_mask(width, height, region)
+            free = (numpy.flatnonzero(mask), mask.shape[1], x0, y0)
+            self.free_cache[key] = free
+        return free
+
+class SpawnSampler:
+    """Draws spawn positions straight from the free space of a WallGrid.
+
+    Same sampler as the desktop build: one random pick from the free
+    corners instead of a bounded rejection loop, Poisson-disk spacing
+    (min_distance, plus `avoid` circles of (x, y, radius)) with an exact
+    carved-mask fallback, relaxing the spacing rather than spawning fewer.
+    Per label timings are kept in self.stats.
+    """
+    DART_ATTEMPTS = 30
+
+    def __init__(self, rng=None):
+        self.rng = rng or random
+        self.stats = {}
+
+    def sample(self, wall_grid, width, height, count=1, min_distance=0, avoid=(),
+               region=None, label='spawn'):
+        """Up to count wall-free top-left corners, as a list of (x, y)."""
+        start = time.perf_counter()
+        indices, columns, x0, y0 = wall_grid.free_positions(width, height, region)
+        rng = self.rng
+        positions = []
+        cell = max(min_distance, 1)
+        grid = collections.defaultdict(list)
+        available = None
+        relaxed = 0
+
+        def pick(free):
+            i = int(free[rng.randrange(len(free))])
+            return x0 + i % columns, y0 + i // columns
+
+        def fits(x, y):
+            for ax, ay, radius in avoid:
+                if (x - ax) ** 2 + (y - ay) ** 2 < radius * radius:
+                    return False
+            cx, cy = x // cell, y // cell
+            for gx in (cx - 1, cx, cx + 1):
+                for gy in (cy - 1, cy, cy + 1):
+                    for px, py in grid.get((gx, gy), ()):
+                        if (x - px) ** 2 + (y - py) ** 2 < min_distance * min_distance:
+                            return False
+            return True
+
+        def carve(mask, x, y, radius):
+            left = max(x - radius - x0 + 1, 0)
+            top = max(y - radius - y0 + 1, 0)
+            right = min(x + radius - x0, mask.shape[1])
+            bottom = min(y + radius - y0, mask.shape[0])
+            if left >= right or top >= bottom:
+                return
+            dy, dx = numpy.ogrid[top + y0 - y:bottom + y0 - y, left + x0 - x:right + x0 - x]
+            mask[top:bottom, left:right] &= dx * dx + dy * dy >= radius * radius
+
+        while len(positions) < count and len(indices):
+            position = None
+            if available is None:
+                for _ in range(self.DART_ATTEMPTS):
+                    x, y = pick(indices)
+                    if fits(x, y):
+                        position = (x, y)
+                        break
+                else:
+                    available = wall_grid.free_mask(width, height, region)[0].copy()
+                    for ax, ay, radius in avoid:
+                        carve(available, ax, ay, radius)
+                    for px, py in positions:
+                        carve(available, px, py, min_distance)
+            if position is None:
+                free = numpy.flatnonzero(available)
+                if len(free):
+                    position = pick(free)
+                else:
+                    position = pick(indices)
+                    relaxed += 1
+            x, y = position
+            positions.append(position)
+            grid[(x // cell, y // cell)].append(position)
+            if available is not None:
+                carve(available, x, y, min_distance)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        stats = self.stats.setdefault(label, {'calls': 0, 'positions': 0, 'relaxed': 0,
+                                              'missing': 0, 'total_ms': 0.0,
+                                              'max_ms': 0.0, 'last_ms': 0.0})
+        stats['calls'] += 1
+        stats['positions'] += len(positions)
+        stats['relaxed'] += relaxed
+        stats['missing'] += count - len(positions)
+        stats['total_ms'] += elapsed
+        stats['max_ms'] = max(stats['max_ms'], elapsed)
+        stats['last_ms'] = elapsed
+        return positions
+
 class Enemy:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
         self.width = 40
         self.height = 40
         self.rect = pygame.Rect(x, y, self.width, self.height)
         self.speed = 1.5
         self.base_speed = self.speed
         self.converted = False
-        self.target_tail = random.choice([True, False])
+        self.target_tail = rng.choice([True, False])
         self.stuck_time = 0
         self.last_pos = self.rect.copy()
         self.movement_directions = [[1, 0], [0, 1], [-1, 0], [0, -1]]
-        self.current_direction = random.randint(0, 3)
+        self.current_direction = rng.randint(0, 3)
 
     def move(self, player_segments, walls):
         if self.converted:
@@ -230,32 +499,23 @@ class Player:
     def find_safe_spawn_position(self):
         safe_distance = 100
         margin = 50
-        
+        body = (self.num_segments - 1) * (self.width + self.segment_spacing)
+
+        # Head positions at least safe_distance from the screen edges and from
+        # each wall's main part, with the whole body clear of walls. The
+        # sampler works in body top-left corners, hence the shift by `body`.
         min_x = margin + safe_distance
         max_x = SCREEN_WIDTH - margin - safe_distance
         min_y = margin + safe_distance
         max_y = SCREEN_HEIGHT - margin - safe_distance
-        
-        max_attempts = 50
-        attempt = 0
-        
-        while attempt < max_attempts:
-            x = random.randint(min_x, max_x)
-            y = random.randint(min_y, max_y)
-            
-            is_safe = True
-            for wall in self.game.walls:
-                wall_center = (wall.rect1.centerx, wall.rect1.centery)
-                distance = ((x - wall_center[0]) ** 2 + (y - wall_center[1]) ** 2) ** 0.5
-                if distance < safe_distance:
-                    is_safe = False
-                    break
-            
-            if is_safe:
-                return (x, y)
-            
-            attempt += 1
-        
+        region = pygame.Rect(min_x - body, min_y, max_x - min_x + 1, max_y - min_y + 1)
+        avoid = [(wall.rect1.centerx - body, wall.rect1.centery, safe_distance)
+                 for wall in self.game.walls]
+        found = self.game.spawner.sample(self.game.wall_grid, body + self.width, self.height,
+                                         avoid=avoid, region=region, label='player')
+        if found:
+            x, y = found[0]
+            return (x + body, y)
         return (SCREEN_WIDTH // 4, SCREEN_HEIGHT // 2)
 
     def move(self, keys, walls):
@@ -343,29 +603,117 @@ class Player:
         pygame.draw.line(screen, LIGHT_GREEN, antenna_start,
                         (head_x + 8, head_y - 12), 2)
 
-class Particle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(2, 5)
-        self.vx = math.cos(angle) * speed
-        self.vy = math.sin(angle) * speed
-        self.lifetime = random.randint(30, 60)
-        self.color = random.choice([YELLOW, GREEN, BLUE, RED])
-        self.size = random.randint(3, 6)
+class ParticlePool:
+    """Fixed-capacity particle system stored as NumPy columns.
+
+    Positions, velocities, lifetimes, colours and sizes live in
+    preallocated arrays; update() moves and culls every particle in a few
+    vectorized operations and draw() issues a single Surface.blits() call
+    using one pre-rendered circle per (colour, size).
+    """
+    def __init__(self, capacity=4096, gravity=0.0, rng=None):
+        self.capacity = capacity
+        self.gravity = gravity
+        self.rng = rng or numpy.random.default_rng()
+        self.count = 0
+        self.x = numpy.zeros(capacity)
+        self.y = numpy.zeros(capacity)
+        self.vx = numpy.zeros(capacity)
+        self.vy = numpy.zeros(capacity)
+        self.lifetime = numpy.zeros(capacity, dtype=numpy.int32)  # frames
+        self.color = numpy.zeros((capacity, 3), dtype=numpy.uint8)
+        self.size = numpy.zeros(capacity, dtype=numpy.int32)
+        self._stamps = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, colors=PARTICLE_COLORS):
+        """Add particles at the given positions (arrays or scalars).
+
+        Particles that do not fit in the remaining capacity are dropped.
+        """
+        x, y = numpy.broadcast_arrays(numpy.asarray(x, dtype=numpy.float64),
+                                      numpy.asarray(y, dtype=numpy.float64))
+        n = min(x.size, self.capacity - self.count)
+        if n <= 0:
+            return
+        start, end = self.count, self.count + n
+        rng = self.rng
+        angle = rng.uniform(0, 2 * math.pi, n)
+        speed = rng.uniform(2, 5, n)
+        self.x[start:end] = x.ravel()[:n]
+        self.y[start:end] = y.ravel()[:n]
+        self.vx[start:end] = numpy.cos(angle) * speed
+        self.vy[start:end] = numpy.sin(angle) * speed
+        self.lifetime[start:end] = rng.integers(30, 61, n)
+        palette = numpy.asarray(colors, dtype=numpy.uint8)
+        self.color[start:end] = palette[rng.integers(0, len(palette), n)]
+        self.size[start:end] = rng.integers(3, 7, n)
+        self.count = end
 
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.lifetime -= 1
-        return self.lifetime > 0
+        n = self.count
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.vy[:n] += self.gravity
+        self.lifetime[:n] -= 1
+
+        alive = self.lifetime[:n] > 0
+        if alive.all():
+            return
+        keep = numpy.flatnonzero(alive)
+        for column in (self.x, self.y, self.vx, self.vy, self.lifetime, self.color, self.size):
+            column[:keep.size] = column[keep]
+        self.count = keep.size
+
+    def _stamp(self, color, size):
+        key = (color, size)
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            stamp = pygame.Surface((2 * size, 2 * size), pygame.SRCALPHA)
+            pygame.draw.circle(stamp, color, (size, size), size)
+            self._stamps[key] = stamp
+        return stamp
 
     def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
+        n = self.count
+        if n == 0:
+            return
+        size = self.size[:n]
+        keys = (self.color[:n].astype(numpy.int64) @ numpy.array([1 << 16, 1 << 8, 1])) * 8 + size
+        _, first, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+        stamps = [self._stamp(tuple(int(c) for c in self.color[i]), int(self.size[i])) for i in first]
+        left = (self.x[:n].astype(numpy.int64) - size).tolist()
+        top = (self.y[:n].astype(numpy.int64) - size).tolist()
+        screen.blits([(stamps[k], (px, py)) for k, px, py in zip(inverse.tolist(), left, top)],
+                     doreturn=False)
+
+def seed_from_args(argv=None):
+    """Return the seed given as "--seed N" or $CATERPILLAR_SEED, else None."""
+    argv = sys.argv[1:] if argv is None else argv
+    value = os.environ.get('CATERPILLAR_SEED')
+    for i, arg in enumerate(argv):
+        if arg == '--seed' and i + 1 < len(argv):
+            value = argv[i + 1]
+        elif arg.startswith('--seed='):
+            value = arg.split('=', 1)[1]
+    return int(value) if value else None
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Every random draw goes through self.rng / self.np_rng so a seed
+        # reproduces a run; without one a seed is drawn and kept in self.seed
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.np_rng = numpy.random.default_rng(seed)
+        self.spawner = SpawnSampler(self.rng)
+
         pygame.init()
         pygame.mixer.init()
         
@@ -395,6 +743,8 @@ class Game:
         
         self.background = pygame.Surface((self.screen_width, self.screen_height))
         self.background.fill(BLACK)
+        self.dirty = DirtyRectTracker((self.screen_width, self.screen_height))
+        self.drawn_scene = None
         
         self.last_damage_time = 0
         self.damage_cooldown = 500
@@ -502,7 +852,17 @@ class Game:
             'stage_complete': './assets/stage_complete.wav',
             'game_over': './assets/game_over.wav'
         }
-        
+        # Prefer the manifest written by build_assets.py (it may point at OGGs)
+        try:
+            with open('./assets/manifest.json') as f:
+                manifest = json.load(f)
+            sound_files = {name: os.path.join('./assets', entry['file'])
+                           for name, entry in manifest['sounds'].items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Ignoring sound manifest: {e}")
+
         for name, path in sound_files.items():
             try:
                 sound = pygame.mixer.Sound(path)
@@ -598,7 +958,7 @@ class Game:
         self.player = Player()
         self.player.game = self
         self.enemies = []
-        self.particles = []
+        self.particles = ParticlePool(rng=self.np_rng)
         self.celebrating = False
         self.celebration_timer = 0
         self.game_over = False
@@ -618,20 +978,20 @@ class Game:
         
         attempts = 0
         while len(self.walls) < num_walls and attempts < 100:
-            is_vertical = random.choice([True, False])
+            is_vertical = self.rng.choice([True, False])
             
             if is_vertical:
-                height = random.randint(min_length, max_length)
+                height = self.rng.randint(min_length, max_length)
                 width = wall_thickness
-                x = random.randint(100, SCREEN_WIDTH - 100)
-                y = random.randint(50, SCREEN_HEIGHT - height)
+                x = self.rng.randint(100, SCREEN_WIDTH - 100)
+                y = self.rng.randint(50, SCREEN_HEIGHT - height)
             else:
-                width = random.randint(min_length, max_length)
+                width = self.rng.randint(min_length, max_length)
                 height = wall_thickness
-                x = random.randint(50, SCREEN_WIDTH - width)
-                y = random.randint(100, SCREEN_HEIGHT - 100)
+                x = self.rng.randint(50, SCREEN_WIDTH - width)
+                y = self.rng.randint(100, SCREEN_HEIGHT - 100)
             
-            new_wall = Wall(x, y, width, height, is_vertical)
+            new_wall = Wall(x, y, width, height, is_vertical, self.rng)
             
             overlap = False
             if new_wall.collides_with(spawn_area):
@@ -649,45 +1009,26 @@ class Game:
             
             attempts += 1
 
+        self.wall_grid = WallGrid(self.walls)
+        self.dirty.invalidate()
+
     def spawn_enemies(self):
         self.enemies.clear()
         num_enemies = self.stage_requirements['enemies'](self.stage)
         
-        attempts = 0
-        while len(self.enemies) < num_enemies and attempts < 100:
-            x = random.randint(50, self.screen_width - 50)
-            y = random.randint(50, self.screen_height - 50)
-            
-            valid_position = True
-            temp_rect = pygame.Rect(x, y, 40, 40)
-            
-            for wall in self.walls:
-                if wall.collides_with(temp_rect):
-                    valid_position = False
-                    break
-            
-            if valid_position:
-                player_head = self.player.segments[0]
-                dx = x - player_head.x
-                dy = y - player_head.y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                too_close_to_enemy = False
-                for enemy in self.enemies:
-                    ex = x - enemy.rect.x
-                    ey = y - enemy.rect.y
-                    enemy_distance = math.sqrt(ex * ex + ey * ey)
-                    if enemy_distance < 100:
-                        too_close_to_enemy = True
-                        break
-                
-                if distance > 200 and not too_close_to_enemy:
-                    enemy = Enemy(x, y)
-                    speed_mult = self.stage_requirements['speed_multiplier'](self.stage)
-                    enemy.speed = enemy.base_speed * speed_mult
-                    self.enemies.append(enemy)
-            
-            attempts += 1
+        speed_mult = self.stage_requirements['speed_multiplier'](self.stage)
+        for x, y in self.enemy_spawn_positions(num_enemies):
+            enemy = Enemy(x, y, self.rng)
+            enemy.speed = enemy.base_speed * speed_mult
+            self.enemies.append(enemy)
+
+    def enemy_spawn_positions(self, count):
+        """Wall-free positions 100px apart and 200px from the caterpillar's head."""
+        head = self.player.segments[0]
+        region = pygame.Rect(50, 50, SCREEN_WIDTH - 99, SCREEN_HEIGHT - 99)
+        return self.spawner.sample(self.wall_grid, 40, 40, count, min_distance=100,
+                                   avoid=[(head.x, head.y, 200)], region=region,
+                                   label='enemies')
 
     def reset_stage(self):
         self.generate_walls()
@@ -697,19 +1038,16 @@ class Game:
         self.player.speed = self.player.base_speed + (self.stage * 0.2)
 
     def create_celebration_particles(self):
-        for _ in range(100):
-            x = random.randint(0, self.screen_width)
-            y = random.randint(0, self.screen_height)
-            self.particles.append(Particle(x, y))
+        rng = self.particles.rng
+        self.particles.emit(rng.integers(0, self.screen_width + 1, 100),
+                            rng.integers(0, self.screen_height + 1, 100))
             
-        for enemy in self.enemies:
-            if enemy.converted:
-                for _ in range(20):
-                    x = enemy.rect.centerx + random.randint(-50, 50)
-                    y = enemy.rect.centery + random.randint(-50, 50)
-                    particle = Particle(x, y)
-                    particle.color = random.choice([GREEN, YELLOW])
-                    self.particles.append(particle)
+        centers = numpy.array([enemy.rect.center for enemy in self.enemies if enemy.converted])
+        if len(centers):
+            centers = numpy.repeat(centers, 20, axis=0)
+            offsets = rng.integers(-50, 51, centers.shape)
+            self.particles.emit(centers[:, 0] + offsets[:, 0], centers[:, 1] + offsets[:, 1],
+                                colors=[GREEN, YELLOW])
 
     def draw_celebration(self):
         if self.celebrating:
@@ -719,31 +1057,29 @@ class Game:
             overlay.set_alpha(alpha)
             self.screen.blit(overlay, (0, 0))
             
-            font = pygame.font.Font(None, 74)
             text = f"Stage {self.stage} Complete!"
             
             glow_colors = [(255, 255, 0, i) for i in range(0, 192, 64)]
             for color in glow_colors:
-                text_surface = font.render(text, True, color)
+                text_surface = text_cache.render(text, 74, color)
                 text_rect = text_surface.get_rect(center=(self.screen_width//2, self.screen_height//2))
                 offset = len(glow_colors) - glow_colors.index(color)
                 for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
                     self.screen.blit(text_surface, 
                                    (text_rect.x + dx * offset, text_rect.y + dy * offset))
             
-            text_surface = font.render(text, True, WHITE)
+            text_surface = text_cache.render(text, 74, WHITE)
             text_rect = text_surface.get_rect(center=(self.screen_width//2, self.screen_height//2))
             self.screen.blit(text_surface, text_rect)
             
-            bonus_font = pygame.font.Font(None, 48)
             bonus_text = f"+{self.stage_requirements['bonus_points'](self.stage)} Points!"
-            bonus_surface = bonus_font.render(bonus_text, True, YELLOW)
+            bonus_surface = text_cache.render(bonus_text, 48, YELLOW)
             bonus_rect = bonus_surface.get_rect(center=(self.screen_width//2, 
                                                       self.screen_height//2 + 60))
             self.screen.blit(bonus_surface, bonus_rect)
 
     def update_particles(self):
-        self.particles = [p for p in self.particles if p.update()]
+        self.particles.update()
 
     def draw_energy_bar(self):
         bar_width = 300
@@ -767,8 +1103,7 @@ class Game:
         pygame.draw.rect(self.screen, BLUE, 
                         (x, y, bar_width, bar_height), 2)
         
-        font = pygame.font.Font(None, 24)
-        energy_text = font.render(f"Energy: {int(self.player.energy)}%", True, BLUE)
+        energy_text = text_cache.render(f"Energy: {int(self.player.energy)}%", 24, BLUE)
         text_rect = energy_text.get_rect()
         text_rect.centerx = x + bar_width // 2
         text_rect.bottom = y - 5
@@ -790,15 +1125,43 @@ class Game:
             pygame.draw.polygon(self.screen, RED, points)
 
     def draw_score(self):
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
-        high_score_text = font.render(f"High Score: {self.high_score}", True, WHITE)
-        stage_text = font.render(f"Stage: {self.stage}", True, WHITE)
+        score_text = text_cache.render(f"Score: {self.score}", 36, WHITE)
+        high_score_text = text_cache.render(f"High Score: {self.high_score}", 36, WHITE)
+        stage_text = text_cache.render(f"Stage: {self.stage}", 36, WHITE)
         
         self.screen.blit(score_text, (10, 10))
         self.screen.blit(high_score_text, (10, 40))
         self.screen.blit(stage_text, (self.screen_width - 200, 10))
 
+    def track_dirty_regions(self):
+        """Report this frame's changed screen regions to self.dirty."""
+        tracker = self.dirty
+        scene = (self.stage, self.paused, self.game_over)
+        if scene != self.drawn_scene or self.celebrating:
+            # New walls, or a full-screen overlay that changed or pulses
+            tracker.invalidate()
+            self.drawn_scene = scene
+
+        for segment in self.player.segments:
+            tracker.add(pygame.Rect(segment.centerx - 16, segment.centery - 16, 32, 32))
+        for enemy in self.enemies:
+            tracker.add(enemy.rect.inflate(4, 4))
+        particles = self.particles
+        if len(particles):
+            n = particles.count
+            reach = int(particles.size[:n].max())
+            x0 = int(particles.x[:n].min()) - reach
+            y0 = int(particles.y[:n].min()) - reach
+            x1 = int(particles.x[:n].max()) + reach
+            y1 = int(particles.y[:n].max()) + reach
+            tracker.add(pygame.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1))
+
+        tracker.mark('score', (self.score, self.high_score), (10, 10, 300, 60))
+        tracker.mark('stage', self.stage, (self.screen_width - 200, 10, 200, 30))
+        tracker.mark('lives', self.player.lives, (10, 70, 25 * max(self.player.lives, 1), 20))
+        bar_x = (self.screen_width - 300) // 2
+        tracker.mark('energy', int(self.player.energy), (bar_x, self.screen_height - 60, 300, 50))
+
     def handle_collisions(self):
         current_time = pygame.time.get_ticks()
         if not self.celebrating:
@@ -848,10 +1211,10 @@ class Game:
 
     def reset_positions(self):
         self.player.reset_position()
-        for enemy in self.enemies:
+        for enemy, (x, y) in zip(self.enemies, self.enemy_spawn_positions(len(self.enemies))):
             enemy.converted = False
-            enemy.rect.x = random.randint(50, SCREEN_WIDTH - 50)
-            enemy.rect.y = random.randint(50, SCREEN_HEIGHT - 50)
+            enemy.rect.x = x
+            enemy.rect.y = y
 
     def handle_menu_click(self, pos):
         if self.paused:
@@ -872,7 +1235,8 @@ class Game:
                 self.game_over = False
 
 async def main():
-    game = Game()
+    game = Game(seed=seed_from_args())
+    print(f"Seed: {game.seed}")
     running = True
 
     while running:
@@ -913,9 +1277,7 @@ async def main():
         game.draw_lives()
         game.draw_score()
 
-        for particle in game.particles:
-            particle.draw(game.screen)
-        game.update_particles()
+        game.particles.draw(game.screen)
 
         if game.celebrating:
             game.draw_celebration()
@@ -926,8 +1288,7 @@ async def main():
             overlay.set_alpha(128)
             game.screen.blit(overlay, (0, 0))
             
-            font = pygame.font.Font(None, 74)
-            text = font.render("PAUSED", True, WHITE)
+            text = text_cache.render("PAUSED", 74, WHITE)
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
             game.screen.blit(text, text_rect)
             
@@ -937,9 +1298,8 @@ async def main():
             pygame.draw.rect(game.screen, GREEN, resume_rect)
             pygame.draw.rect(game.screen, RED, restart_rect)
             
-            font = pygame.font.Font(None, 36)
-            resume_text = font.render("Resume", True, BLACK)
-            restart_text = font.render("Restart", True, BLACK)
+            resume_text = text_cache.render("Resume", 36, BLACK)
+            restart_text = text_cache.render("Restart", 36, BLACK)
             
             resume_text_rect = resume_text.get_rect(center=resume_rect.center)
             restart_text_rect = restart_text.get_rect(center=restart_rect.center)
@@ -957,25 +1317,24 @@ async def main():
             overlay.set_alpha(128)
             game.screen.blit(overlay, (0, 0))
             
-            font = pygame.font.Font(None, 74)
-            text = font.render("GAME OVER", True, RED)
+            text = text_cache.render("GAME OVER", 74, RED)
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//3))
             game.screen.blit(text, text_rect)
             
-            font = pygame.font.Font(None, 48)
-            score_text = font.render(f"Stage: {game.stage}", True, WHITE)
+            score_text = text_cache.render(f"Stage: {game.stage}", 48, WHITE)
             score_rect = score_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             game.screen.blit(score_text, score_rect)
             
             restart_rect = pygame.Rect(SCREEN_WIDTH//2 - 50, SCREEN_HEIGHT*2//3, 100, 40)
             pygame.draw.rect(game.screen, GREEN, restart_rect)
             
-            font = pygame.font.Font(None, 36)
-            restart_text = font.render("Restart", True, BLACK)
+            restart_text = text_cache.render("Restart", 36, BLACK)
             restart_text_rect = restart_text.get_rect(center=restart_rect.center)
             game.screen.blit(restart_text, restart_text_rect)
 
-        pygame.display.flip()
+        game.track_dirty_regions()
+        game.dirty.present()
+        game.update_particles()
         game.clock.tick(60)
         await asyncio.sleep(0)
 
@@ -1,78 +1,112 @@
 import wave
-import math
-import struct
 import os
+import numpy
 
-def generate_sine_wave(frequency, duration, amplitude=0.5, sample_rate=22050):  # Lower sample rate for web
-    n_samples = int(sample_rate * duration)
-    samples = []
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        sample = amplitude * math.sin(2.0 * math.pi * frequency * t)
-        samples.append(sample)
-    return samples
-
-def generate_square_wave(frequency, duration, amplitude=0.5, sample_rate=22050):
-    n_samples = int(sample_rate * duration)
-    samples = []
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        if math.sin(2.0 * math.pi * frequency * t) >= 0:
-            sample = amplitude
-        else:
-            sample = -amplitude
-        samples.append(sample)
-    return samples
-
-def save_wave(samples, filename, sample_rate=22050):
-    # Convert samples to 16-bit integers
-    packed_samples = []
-    for sample in samples:
-        packed_value = int(sample * 32767.0)
-        packed_samples.append(struct.pack('h', packed_value))
+SAMPLE_RATE = 22050  # Lower sample rate for web
 
+# Each effect is a sequence of tones played back to back:
+# (frequency, duration, amplitude) or (frequency, duration, amplitude, 'square')
+EFFECTS = {
+    # Quick descending tone
+    'collision': [(440, 0.05, 0.8), (220, 0.05, 0.6)],
+    # Rising cheerful tone
+    'convert': [(440, 0.05, 0.5), (880, 0.1, 0.6)],
+    # Victory fanfare
+    'stage_complete': [(440, 0.05, 0.5), (550, 0.05, 0.5), (660, 0.1, 0.6)],
+    # Sad descending tones
+    'game_over': [(440, 0.1, 0.6), (330, 0.1, 0.5), (220, 0.15, 0.4)],
+}
+
+def render_tones(tones, sample_rate=SAMPLE_RATE):
+    """Render consecutive tones into one float64 array with a single sin call.
+
+    Every tone restarts its phase at zero, exactly like concatenating the
+    output of generate_sine_wave / generate_square_wave.
+    """
+    tones = [tuple(tone) + ('sine',) * (4 - len(tone)) for tone in tones]
+    counts = numpy.array([int(sample_rate * duration) for _, duration, _, _ in tones], dtype=numpy.intp)
+    total = int(counts.sum())
+    if total == 0:
+        return numpy.zeros(0)
+
+    starts = numpy.cumsum(counts) - counts
+    index = numpy.arange(total) - numpy.repeat(starts, counts)
+    frequency = numpy.repeat([float(tone[0]) for tone in tones], counts)
+    amplitude = numpy.repeat([float(tone[2]) for tone in tones], counts)
+    square = numpy.repeat([tone[3] == 'square' for tone in tones], counts)
+
+    t = index / sample_rate
+    wave_values = numpy.sin(2.0 * numpy.pi * frequency * t)
+    return numpy.where(square, numpy.where(wave_values >= 0, amplitude, -amplitude),
+                       amplitude * wave_values)
+
+def scale_tones(tones, pitch=1.0, length=1.0, volume=1.0):
+    """Return a pitch/length/volume variant of a tone sequence."""
+    return [(tone[0] * pitch, tone[1] * length, tone[2] * volume) + tuple(tone[3:])
+            for tone in tones]
+
+def to_pcm(samples):
+    """Convert float samples in [-1, 1] to int16, truncating like int()."""
+    return (numpy.asarray(samples, dtype=numpy.float64) * 32767.0).astype(numpy.int16)
+
+def generate_sine_wave(frequency, duration, amplitude=0.5, sample_rate=SAMPLE_RATE):
+    return render_tones([(frequency, duration, amplitude)], sample_rate).tolist()
+
+def generate_square_wave(frequency, duration, amplitude=0.5, sample_rate=SAMPLE_RATE):
+    return render_tones([(frequency, duration, amplitude, 'square')], sample_rate).tolist()
+
+def write_pcm(pcm, filename, sample_rate=SAMPLE_RATE):
     # Create WAV file
     with wave.open(filename, 'wb') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 2 bytes per sample
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(b''.join(packed_samples))
+        wav_file.writeframes(numpy.ascontiguousarray(pcm, dtype='<i2').tobytes())
+
+def save_wave(samples, filename, sample_rate=SAMPLE_RATE):
+    write_pcm(to_pcm(samples), filename, sample_rate)
+
+def render_batch(effects, sample_rate=SAMPLE_RATE):
+    """Render many effects in one vectorized pass.
+
+    Returns (pcm, spans): pcm is a single int16 buffer holding every effect
+    back to back and spans maps each effect name to its (start, stop) slice.
+    """
+    tones = []
+    spans = {}
+    start = 0
+    for name, effect_tones in effects.items():
+        length = sum(int(sample_rate * tone[1]) for tone in effect_tones)
+        spans[name] = (start, start + length)
+        tones.extend(effect_tones)
+        start += length
+    return to_pcm(render_tones(tones, sample_rate)), spans
+
+def write_batch(effects, directory='./assets', sample_rate=SAMPLE_RATE):
+    """Render effects with render_batch and write each one to <directory>/<name>.wav."""
+    os.makedirs(directory, exist_ok=True)
+    pcm, spans = render_batch(effects, sample_rate)
+    paths = {}
+    for name, (start, stop) in spans.items():
+        paths[name] = os.path.join(directory, f"{name}.wav")
+        write_pcm(pcm[start:stop], paths[name], sample_rate)
+    return paths
 
 def create_collision_sound():
-    # Quick descending tone
-    samples = generate_sine_wave(440, 0.05, 0.8)  # Shorter duration
-    samples.extend(generate_sine_wave(220, 0.05, 0.6))
-    save_wave(samples, './assets/collision.wav')
+    save_wave(render_tones(EFFECTS['collision']), './assets/collision.wav')
 
 def create_convert_sound():
-    # Rising cheerful tone
-    samples = generate_sine_wave(440, 0.05, 0.5)  # Shorter duration
-    samples.extend(generate_sine_wave(880, 0.1, 0.6))
-    save_wave(samples, './assets/convert.wav')
+    save_wave(render_tones(EFFECTS['convert']), './assets/convert.wav')
 
 def create_stage_complete_sound():
-    # Victory fanfare
-    samples = generate_sine_wave(440, 0.05, 0.5)  # Shorter duration
-    samples.extend(generate_sine_wave(550, 0.05, 0.5))
-    samples.extend(generate_sine_wave(660, 0.1, 0.6))
-    save_wave(samples, './assets/stage_complete.wav')
+    save_wave(render_tones(EFFECTS['stage_complete']), './assets/stage_complete.wav')
 
 def create_game_over_sound():
-    # Sad descending tones
-    samples = generate_sine_wave(440, 0.1, 0.6)
-    samples.extend(generate_sine_wave(330, 0.1, 0.5))
-    samples.extend(generate_sine_wave(220, 0.15, 0.4))
-    save_wave(samples, './assets/game_over.wav')
+    save_wave(render_tones(EFFECTS['game_over']), './assets/game_over.wav')
 
 def main():
-    # Ensure assets directory exists
-    os.makedirs('./assets', exist_ok=True)
-    
     # Generate all sound effects
-    create_collision_sound()
-    create_convert_sound()
-    create_stage_complete_sound()
-    create_game_over_sound()
+    write_batch(EFFECTS, './assets')
     print("Sound files generated successfully in ./assets directory")
 
 if __name__ == '__main__':
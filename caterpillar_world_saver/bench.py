@@ -0,0 +1,281 @@
+"""
+Benchmarks for the simulation and render hot paths of Caterpillar World Saver.
+
+Every case starts from the same deterministic headless Game: a fixed seed,
+the stage's walls and enemies, and WARMUP_TICKS of scripted wandering so
+enemies are mid-chase. The state is snapshotted once and restored before
+each round, so every round (and every run on every commit) times exactly
+the same work. Stage cases cover stages 1, 50, 100 and 155; swarm cases
+put SWARM_SIZE enemies on the stage-155 walls in fixed layouts, and
+swarm-lod puts LOD_SWARM_SIZE in the grid layout, enough for the AI
+scheduler's levels to apply (see AI_LOD_MIN_ENEMIES).
+
+Per call timings are summarised as median, p95, min and mean milliseconds
+and written as JSON. Compare a run with a stored baseline to catch
+regressions, in particular in the stage-155 frame (update plus draw):
+
+    python -m caterpillar_world_saver.bench --output baseline.json
+    python -m caterpillar_world_saver.bench --compare baseline.json
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+
+import numpy
+import pygame
+
+try:
+    from .game import (FPS, Game, EnemySwarm, ScriptedInput, WINDOW_WIDTH, WINDOW_HEIGHT,
+                       AI_LOD_MIN_ENEMIES)
+except ImportError:  # Imported from inside the package directory (pygbag)
+    from game import (FPS, Game, EnemySwarm, ScriptedInput, WINDOW_WIDTH, WINDOW_HEIGHT,
+                      AI_LOD_MIN_ENEMIES)
+
+BENCH_SEED = 20240601
+BENCH_VERSION = 2
+STAGES = (1, 50, 100, 155)
+SWARM_STAGE = 155
+SWARM_SIZE = 256
+SWARM_LAYOUTS = ('ring', 'cluster', 'grid')
+LOD_SWARM_SIZE = 2 * AI_LOD_MIN_ENEMIES  # Placed, before wall rejection
+CASES = ('update', 'collisions', 'enemy_move', 'ai_update', 'stage_build', 'draw')
+WARMUP_TICKS = 120
+ROUNDS = 5
+CALLS = 60  # Timed calls per round
+THRESHOLD = 0.15  # Median slowdown reported as a regression
+NOISE_FLOOR_MS = 0.01  # Differences below this are never regressions
+FRAME_BUDGET_MS = 1000 / FPS
+
+WANDER_KEYS = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+
+def wander_script(period=45):
+    """Scripted input that turns every `period` ticks: right, down, left, up."""
+    calls = [0]
+    def keys():
+        calls[0] += 1
+        return (WANDER_KEYS[calls[0] // period % len(WANDER_KEYS)],)
+    return keys
+
+def build_game(stage, seed=BENCH_SEED):
+    """Headless game on `stage` with freshly generated walls and enemies."""
+    game = Game(headless=True, seed=seed, input_source=ScriptedInput(script=wander_script()))
+    game.stage = stage
+    game.generate_walls()
+    game.spawn_enemies()
+    return game
+
+def swarm_positions(layout, game, count=SWARM_SIZE):
+    """Enemy top-left corners for a synthetic layout, before wall rejection."""
+    head_x, head_y = game.player.segments[0].center
+    if layout == 'ring':
+        # Closing in on the head from every side
+        angles = numpy.linspace(0, 2 * math.pi, count, endpoint=False)
+        radius = 60 + 140 * (numpy.arange(count) % 4) / 3
+        xs = head_x + radius * numpy.cos(angles)
+        ys = head_y + radius * numpy.sin(angles)
+    elif layout == 'cluster':
+        # Piled onto the caterpillar: the worst case for collision handling
+        xs = head_x - 60 + game.np_rng.normal(0, 40, count)
+        ys = head_y + game.np_rng.normal(0, 40, count)
+    elif layout == 'grid':
+        columns = math.ceil(math.sqrt(count * WINDOW_WIDTH / WINDOW_HEIGHT))
+        rows = math.ceil(count / columns)
+        xs = (numpy.arange(count) % columns + 0.5) * WINDOW_WIDTH / columns
+        ys = (numpy.arange(count) // columns + 0.5) * WINDOW_HEIGHT / rows
+    else:
+        raise ValueError(f"Unknown swarm layout {layout!r}")
+    xs = numpy.clip(xs - EnemySwarm.width / 2, 0, WINDOW_WIDTH - EnemySwarm.width)
+    ys = numpy.clip(ys - EnemySwarm.height / 2, 0, WINDOW_HEIGHT - EnemySwarm.height)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+def build_swarm(layout, seed=BENCH_SEED, count=SWARM_SIZE):
+    """Stage-155 walls with `count` enemies placed in `layout`."""
+    game = build_game(SWARM_STAGE, seed)
+    game.enemies.clear()
+    for x, y in swarm_positions(layout, game, count):
+        rect = pygame.Rect(int(x), int(y), EnemySwarm.width, EnemySwarm.height)
+        if not game.wall_grid.collides_with(rect):
+            game.enemies.spawn(x, y)
+    return game
+
+def warm_up(game, ticks=WARMUP_TICKS):
+    """Play `ticks` scripted ticks, keeping the caterpillar alive."""
+    for _ in range(ticks):
+        game.player.lives = max(game.player.lives, 3)
+        game.update()
+        game.end_frame()
+        game.clock.tick(FPS)
+    game.game_over = False
+    return game
+
+def stage_cases(game):
+    """The timed operations on a game, keyed by the names in CASES."""
+    def stage_build():
+        game.generate_walls()
+        game.spawn_enemies()
+    def enemy_move():
+        # Every enemy, bypassing the AI scheduler
+        segments = game.player.segments
+        game.flow_field.update(game.wall_grid, (segments[0].center, segments[-1].center))
+        game.enemies.move(segments, game.wall_grid, flow_field=game.flow_field)
+    def ai_update():
+        # As Game.update() runs it: through the scheduler, tick by tick
+        segments = game.player.segments
+        game.flow_field.update(game.wall_grid, (segments[0].center, segments[-1].center))
+        game.ai.update(game.enemies, segments, game.wall_grid, game.tick_count,
+                       flow_field=game.flow_field)
+        game.tick_count += 1
+    return {
+        'update': game.update,
+        'collisions': game.handle_collisions,
+        'enemy_move': enemy_move,
+        'ai_update': ai_update,
+        'stage_build': stage_build,
+        'draw': game.draw,
+    }
+
+def time_calls(game, state, func, rounds=ROUNDS, calls=CALLS):
+    """Per call milliseconds of func over `rounds` rounds from `state`."""
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            game.restore(state)
+            game.draw()  # Rebake the wall layer outside the timings
+            for _ in range(calls):
+                start = time.perf_counter_ns()
+                func()
+                samples.append(time.perf_counter_ns() - start)
+                game.end_frame()
+                game.clock.tick(FPS)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    samples = numpy.array(samples) / 1e6
+    return {
+        'median_ms': float(numpy.median(samples)),
+        'p95_ms': float(numpy.percentile(samples, 95)),
+        'min_ms': float(samples.min()),
+        'mean_ms': float(samples.mean()),
+        'calls': int(samples.size),
+    }
+
+def scenarios():
+    """(name, builder) for every benchmarked game state.
+
+    Swarm scenarios skip stage_build, which would replace the synthetic swarm.
+    """
+    for stage in STAGES:
+        yield f"stage{stage}", lambda stage=stage: build_game(stage)
+    for layout in SWARM_LAYOUTS:
+        yield f"swarm-{layout}", lambda layout=layout: build_swarm(layout)
+    yield "swarm-lod", lambda: build_swarm('grid', count=LOD_SWARM_SIZE)
+
+def run(rounds=ROUNDS, calls=CALLS, only=None, progress=None):
+    """Run every case whose name contains `only`; returns the results dict."""
+    results = {}
+    for scenario, build in scenarios():
+        cases = [case for case in CASES
+                 if not (only and only not in f"{scenario}/{case}")
+                 and not (scenario.startswith('swarm') and case == 'stage_build')]
+        if not cases:
+            continue
+        game = warm_up(build())
+        state = game.snapshot()
+        functions = stage_cases(game)
+        for case in cases:
+            name = f"{scenario}/{case}"
+            results[name] = time_calls(game, state, functions[case], rounds, calls)
+            if progress:
+                progress(name, results[name])
+    return results
+
+def frame_budget(results):
+    """Stage-155 update plus draw median against the per-frame budget."""
+    try:
+        frame = results['stage155/update']['median_ms'] + results['stage155/draw']['median_ms']
+    except KeyError:
+        return None
+    return {'frame_ms': frame, 'budget_ms': FRAME_BUDGET_MS, 'share': frame / FRAME_BUDGET_MS}
+
+def report(results):
+    return {
+        'version': BENCH_VERSION,
+        'seed': BENCH_SEED,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'results': results,
+        'frame_budget': frame_budget(results),
+    }
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """Median changes against a baseline report; returns (lines, regressions).
+
+    Only cases present in this run are compared.
+    """
+    lines = []
+    regressions = []
+    base_results = baseline['results']
+    for name in sorted(results):
+        if name not in base_results:
+            lines.append(f"{name:28} not in baseline")
+            continue
+        new = results[name]['median_ms']
+        old = base_results[name]['median_ms']
+        ratio = new / old if old else math.inf
+        mark = ''
+        if ratio > 1 + threshold and new - old > NOISE_FLOOR_MS:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 - threshold and old - new > NOISE_FLOOR_MS:
+            mark = '  faster'
+        lines.append(f"{name:28} {old:9.3f} -> {new:9.3f} ms  {ratio:6.2f}x{mark}")
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and render hot paths.")
+    parser.add_argument('--output', help="write the results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="compare medians with a stored results file; exits 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="median slowdown counted as a regression (default 0.15)")
+    parser.add_argument('--rounds', type=int, default=ROUNDS)
+    parser.add_argument('--calls', type=int, default=CALLS, help="timed calls per round")
+    parser.add_argument('--only', help="run only cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    def progress(name, result):
+        print(f"{name:28} median {result['median_ms']:8.3f} ms  p95 {result['p95_ms']:8.3f} ms")
+    results = run(args.rounds, args.calls, args.only, progress)
+    data = report(results)
+    budget = data['frame_budget']
+    if budget:
+        print(f"Stage 155 frame: {budget['frame_ms']:.2f} ms of {budget['budget_ms']:.2f} ms "
+              f"budget ({budget['share']:.0%})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f"\nCompared with {args.compare}:")
+        print('\n'.join(lines))
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
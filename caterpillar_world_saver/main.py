@@ -16,8 +16,12 @@ async def main():
     pygame.display.set_caption("Caterpillar World Saver")
     
     # Create game instance
-    from game import Game
-    game = Game()
+    from game import Game, seed_from_args, sim_rate_from_args
+    from replay import start_recording
+    game = Game(dirty_rects=True, seed=seed_from_args(),
+                sim_rate=sim_rate_from_args())
+    print(f"Seed: {game.seed}")
+    recorder = start_recording(game)
     
     # Main game loop
     running = True
@@ -31,18 +35,17 @@ async def main():
                 running = False
             game.handle_event(event)
         
-        # Clear screen
-        screen.fill((255, 255, 255))
-        
-        # Update and draw
-        if not game.paused and not game.game_over:
-            game.update()
+        # Run the simulation ticks due since the last frame, then draw
+        game.advance()
         game.draw()
         
-        # Update display
-        pygame.display.flip()
+        # Update display (only the regions that changed)
+        game.present()
         
-        # Cap at 60 FPS
-        await asyncio.sleep(1/60)
+        # Cap at 60 FPS, less while paused or on game over
+        await asyncio.sleep(1/game.frame_rate())
+
+    if recorder is not None:
+        recorder.close()
 
 asyncio.run(main())
@@ -0,0 +1,437 @@
+"""
+Compact input recording and headless playback for Caterpillar World Saver.
+
+A replay holds the game's seed and sim rate and, for every update() tick,
+how far the clock moved and which direction keys were held (touch and
+mouse-drag swipes count as arrow keys, see game.Swipe), with left clicks
+in between. Each record is one LEB128 varint ``(elapsed_ms << 2) | kind``,
+followed by the key mask only when it changed or by the click position, so
+a typical tick costs a single byte.
+
+After the END record a replay may carry keyframes: zlib-compressed
+Game.snapshot() pickles taken every KEYFRAME_INTERVAL ticks, located through
+a footer table of (tick, record offset, clock time, key mask, blob offset,
+blob size) and a fixed-size trailer. ReplayPlayer.seek() restores the
+nearest keyframe and simulates at most one interval forward. Replays
+without keyframes (or cut short by a crash) stay playable from the start;
+``index`` adds keyframes to them.
+
+Record a session by passing ``--record FILE`` (or setting
+CATERPILLAR_RECORD) to an entry point, then replay it faster than real
+time, e.g. under the profiler:
+
+    python -m cProfile -s cumtime -m caterpillar_world_saver.replay play FILE
+
+Keyframes are pickles, so only load replays you trust.
+"""
+
+import argparse
+import bisect
+import collections
+import pickle
+import struct
+import time
+import zlib
+
+import pygame
+
+try:
+    from .game import Game, HeldKeys, VirtualClock, option_from_args
+except ImportError:  # Imported from inside the package directory (pygbag)
+    from game import Game, HeldKeys, VirtualClock, option_from_args
+
+MAGIC = b'CWRP'
+VERSION = 6  # Bumped whenever a seed and input no longer replay the same game
+
+# Record kinds (low two bits of each record's head varint)
+TICK = 0  # update() with the same keys as the previous tick
+TICK_KEYS = 1  # update() with new keys; followed by the key mask
+CLICK = 2  # left click; followed by x and y
+END = 3
+
+KEYFRAME_INTERVAL = 600  # ticks (10 seconds at 60 FPS)
+INDEX_MAGIC = b'CWKF'
+INDEX_ENTRY = struct.Struct('<QQQIQI')
+INDEX_TRAILER = struct.Struct('<QI4s')  # table offset, entry count, magic
+
+Keyframe = collections.namedtuple(
+    'Keyframe', 'tick offset clock_time mask blob_offset blob_size')
+
+# Bit i of the key mask is set while any key in DIRECTION_KEYS[i] is held
+DIRECTION_KEYS = [
+    (pygame.K_LEFT, pygame.K_a),
+    (pygame.K_RIGHT, pygame.K_d),
+    (pygame.K_UP, pygame.K_w),
+    (pygame.K_DOWN, pygame.K_s),
+]
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    """Decode one varint at pos; returns (value, next_pos)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def read_record(data, pos):
+    """Decode the record at pos; returns (kind, elapsed_ms, payload, next_pos).
+
+    payload is the key mask for TICK_KEYS, (x, y) for CLICK and None
+    otherwise. Raises IndexError if the record is cut off.
+    """
+    head, pos = read_varint(data, pos)
+    kind = head & 3
+    payload = None
+    if kind == TICK_KEYS:
+        payload, pos = read_varint(data, pos)
+    elif kind == CLICK:
+        x, pos = read_varint(data, pos)
+        y, pos = read_varint(data, pos)
+        payload = (x, y)
+    return kind, head >> 2, payload, pos
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+def key_mask(keys):
+    mask = 0
+    for bit, group in enumerate(DIRECTION_KEYS):
+        if any(keys[key] for key in group):
+            mask |= 1 << bit
+    return mask
+
+def mask_keys(mask):
+    return HeldKeys(group[0] for bit, group in enumerate(DIRECTION_KEYS) if mask >> bit & 1)
+
+def pack_keyframe(game):
+    return zlib.compress(pickle.dumps(game.snapshot(), pickle.HIGHEST_PROTOCOL), 1)
+
+def write_keyframes(out, keyframes):
+    """Append keyframe blobs plus the footer table to a file at its end.
+
+    keyframes is a list of (tick, offset, clock_time, mask, blob) tuples.
+    """
+    entries = []
+    position = out.tell()
+    for tick, offset, clock_time, mask, blob in keyframes:
+        out.write(blob)
+        entries.append(INDEX_ENTRY.pack(tick, offset, clock_time, mask, position, len(blob)))
+        position += len(blob)
+    out.write(b''.join(entries))
+    out.write(INDEX_TRAILER.pack(position, len(entries), INDEX_MAGIC))
+
+class ReplayRecorder:
+    """Input source wrapper that logs a game's input to a replay file.
+
+    Create it right after the game: it takes over game.input_source and
+    game.recorder and writes the seed, sim rate and current clock time as
+    the header.
+    Records are buffered and flushed every flush_size bytes, so a crashed
+    session still leaves a playable (truncated) replay. A keyframe is
+    taken every keyframe_interval ticks (None disables them) and written
+    out by close().
+    """
+    flush_size = 4096
+
+    def __init__(self, game, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.game = game
+        self.source = game.input_source
+        self.file = open(path, 'wb')
+        self.buffer = bytearray(MAGIC)
+        write_varint(self.buffer, VERSION)
+        write_varint(self.buffer, zigzag(game.seed))
+        write_varint(self.buffer, game.sim_rate)
+        self.last_time = game.clock.get_ticks()
+        write_varint(self.buffer, self.last_time)
+        self.written = 0
+        self.mask = 0
+        self.ticks = 0
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = []
+        game.input_source = self
+        game.recorder = self
+
+    def _head(self, kind):
+        elapsed = max(0, self.game.clock.get_ticks() - self.last_time)
+        self.last_time += elapsed
+        write_varint(self.buffer, elapsed << 2 | kind)
+
+    def get_pressed(self):
+        # Called at the top of update(), before this tick changes anything
+        if self.keyframe_interval and self.ticks % self.keyframe_interval == 0:
+            self.keyframes.append((self.ticks, self.written + len(self.buffer),
+                                   self.last_time, self.mask, pack_keyframe(self.game)))
+        keys = self.source.get_pressed()
+        mask = key_mask(keys)
+        if mask == self.mask:
+            self._head(TICK)
+        else:
+            self._head(TICK_KEYS)
+            write_varint(self.buffer, mask)
+            self.mask = mask
+        self.ticks += 1
+        if len(self.buffer) >= self.flush_size:
+            self.flush()
+        return keys
+
+    def record_click(self, pos):
+        self._head(CLICK)
+        write_varint(self.buffer, max(0, int(pos[0])))
+        write_varint(self.buffer, max(0, int(pos[1])))
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.written += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        """Finish the replay and give the game back its own input source."""
+        if self.file.closed:
+            return
+        self._head(END)
+        self.flush()
+        if self.keyframes:
+            write_keyframes(self.file, self.keyframes)
+        self.file.close()
+        self.game.input_source = self.source
+        self.game.recorder = None
+
+class Replay:
+    """A parsed replay: the header fields, record stream and keyframe index."""
+    def __init__(self, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a replay file")
+        pos = len(MAGIC)
+        self.version, pos = read_varint(data, pos)
+        if self.version != VERSION:
+            raise ValueError(f"Unsupported replay version {self.version}")
+        seed, pos = read_varint(data, pos)
+        self.seed = unzigzag(seed)
+        self.sim_rate, pos = read_varint(data, pos)
+        self.start_time, pos = read_varint(data, pos)
+        self.data = data
+        self.body = pos
+        self.keyframes = self._read_index()
+        self.keyframe_ticks = [keyframe.tick for keyframe in self.keyframes]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def _read_index(self):
+        data = self.data
+        if len(data) < INDEX_TRAILER.size:
+            return []
+        table, count, magic = INDEX_TRAILER.unpack_from(data, len(data) - INDEX_TRAILER.size)
+        if magic != INDEX_MAGIC:
+            return []
+        return [Keyframe(*INDEX_ENTRY.unpack_from(data, table + i * INDEX_ENTRY.size))
+                for i in range(count)]
+
+    def load_keyframe(self, keyframe):
+        blob = self.data[keyframe.blob_offset:keyframe.blob_offset + keyframe.blob_size]
+        return pickle.loads(zlib.decompress(blob))
+
+    def records(self, offset=None, clock_time=None):
+        """Yield (offset, kind, clock_time, payload) for every record before END.
+
+        Reading can start mid-stream from a keyframe's offset and
+        clock_time. A truncated stream simply ends early.
+        """
+        data = self.data
+        pos = self.body if offset is None else offset
+        clock_time = self.start_time if clock_time is None else clock_time
+        try:
+            while pos < len(data):
+                kind, elapsed, payload, next_pos = read_record(data, pos)
+                if kind == END:
+                    return
+                clock_time += elapsed
+                yield pos, kind, clock_time, payload
+                pos = next_pos
+        except IndexError:
+            return
+
+    def stream_end(self):
+        """Offset just past the last complete record before END or a cut."""
+        data = self.data
+        pos = self.body
+        try:
+            while pos < len(data):
+                kind, _, _, next_pos = read_record(data, pos)
+                if kind == END:
+                    break
+                pos = next_pos
+        except IndexError:
+            pass
+        return pos
+
+class ReplayPlayer:
+    """Feeds a replay back through Game.update() on a headless game.
+
+    The player is the game's input source and drives its VirtualClock to
+    the recorded times, so nothing waits on the wall clock. Playback is
+    exact for sessions recorded on a VirtualClock; live sessions sample the
+    clock once per tick, so time-based checks may differ by a millisecond.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+        self.clock = VirtualClock(replay.sim_rate)
+        self.restart()
+
+    def restart(self):
+        replay = self.replay
+        self.clock.ticks = replay.start_time
+        self.keys = HeldKeys()
+        self.mask = 0
+        self.tick = 0  # ticks played so far
+        self.game = Game(headless=True, seed=replay.seed, input_source=self, clock=self.clock,
+                         sim_rate=replay.sim_rate)
+        self.records = replay.records()
+
+    def get_pressed(self):
+        return self.keys
+
+    def play(self, max_ticks=None, on_tick=None):
+        """Play the rest of the replay, or at most max_ticks more ticks.
+
+        on_tick(offset, clock_time), if given, is called before each tick
+        is simulated. Returns the number of ticks played.
+        """
+        played = 0
+        if max_ticks is not None and max_ticks <= 0:
+            return played
+        for offset, kind, clock_time, payload in self.records:
+            if kind == CLICK:
+                self.clock.ticks = clock_time
+                self.game.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+                                                          button=1, pos=payload))
+                continue
+            if on_tick is not None:
+                on_tick(offset, self.clock.get_ticks())
+            self.clock.ticks = clock_time
+            if kind == TICK_KEYS:
+                self.mask = payload
+                self.keys = mask_keys(payload)
+            self.game.update()
+            self.game.end_frame()
+            self.tick += 1
+            played += 1
+            if max_ticks is not None and played >= max_ticks:
+                break
+        return played
+
+    def restore_keyframe(self, keyframe):
+        self.game.restore(self.replay.load_keyframe(keyframe))
+        self.clock.ticks = keyframe.clock_time
+        self.mask = keyframe.mask
+        self.keys = mask_keys(keyframe.mask)
+        self.tick = keyframe.tick
+        self.records = self.replay.records(keyframe.offset, keyframe.clock_time)
+
+    def seek(self, tick):
+        """Move to just before the given tick (0-based), as if played there.
+
+        Restores the nearest keyframe at or before tick unless the current
+        position is already closer, then simulates the remaining ticks.
+        Returns the number of ticks simulated.
+        """
+        i = bisect.bisect_right(self.replay.keyframe_ticks, tick) - 1
+        if i >= 0:
+            keyframe = self.replay.keyframes[i]
+            if not keyframe.tick <= self.tick <= tick:
+                self.restore_keyframe(keyframe)
+        elif self.tick > tick:
+            self.restart()
+        return self.play(tick - self.tick)
+
+def add_keyframes(path, interval=KEYFRAME_INTERVAL):
+    """Rewrite a replay file with keyframes every interval ticks.
+
+    Works on replays recorded without keyframes and on truncated ones, which
+    get a proper END record. Returns the number of keyframes written.
+    """
+    replay = Replay.load(path)
+    player = ReplayPlayer(replay)
+    keyframes = []
+
+    def on_tick(offset, clock_time):
+        if player.tick % interval == 0:
+            keyframes.append((player.tick, offset, clock_time, player.mask,
+                              pack_keyframe(player.game)))
+
+    player.play(on_tick=on_tick)
+    with open(path, 'wb') as f:
+        f.write(replay.data[:replay.stream_end()])
+        f.write(bytes([END]))
+        write_keyframes(f, keyframes)
+    return len(keyframes)
+
+def start_recording(game, argv=None):
+    """Attach a ReplayRecorder if "--record FILE" or $CATERPILLAR_RECORD is set."""
+    path = option_from_args('record', 'CATERPILLAR_RECORD', argv)
+    if path is None:
+        return None
+    print(f"Recording replay to {path}")
+    return ReplayRecorder(game, path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect, index or play back a recorded replay.")
+    parser.add_argument('command', choices=['play', 'info', 'index'])
+    parser.add_argument('path')
+    parser.add_argument('--ticks', type=int, default=None, help="stop after this many ticks")
+    parser.add_argument('--start', type=int, default=0, help="seek to this tick before playing")
+    parser.add_argument('--interval', type=int, default=KEYFRAME_INTERVAL,
+                        help="ticks between keyframes (index)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'index':
+        pygame.init()
+        count = add_keyframes(args.path, args.interval)
+        print(f"Wrote {count} keyframes to {args.path}")
+        return
+
+    replay = Replay.load(args.path)
+    if args.command == 'info':
+        counts = [0, 0, 0]
+        for _, kind, _, _ in replay.records():
+            counts[kind] += 1
+        ticks = counts[TICK] + counts[TICK_KEYS]
+        print(f"seed {replay.seed} at {replay.sim_rate} Hz, {ticks} ticks ({counts[TICK_KEYS]} key changes), "
+              f"{counts[CLICK]} clicks, {len(replay.keyframes)} keyframes, "
+              f"{len(replay.data)} bytes")
+        return
+
+    pygame.init()
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    if args.start:
+        player.seek(args.start)
+        print(f"Seeked to tick {player.tick} in {time.perf_counter() - start:.2f}s")
+    start_time = player.clock.get_ticks()
+    start = time.perf_counter()
+    ticks = player.play(args.ticks)
+    elapsed = time.perf_counter() - start
+    game = player.game
+    simulated = (player.clock.get_ticks() - start_time) / 1000
+    print(f"Played {ticks} ticks ({simulated:.1f}s of game time) in {elapsed:.2f}s")
+    print(f"Stage {game.stage}, lives {game.player.lives}, "
+          f"energy {game.player.energy}, game over: {game.game_over}")
+
+if __name__ == '__main__':
+    main()
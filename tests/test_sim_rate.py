@@ -0,0 +1,48 @@
+"""The caterpillar's shape must not depend on the simulation rate."""
+
+import math
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+import pytest
+
+from caterpillar_world_saver.game import Game, ScriptedInput, WallGrid
+
+TURNS = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_RIGHT, pygame.K_UP, pygame.K_LEFT, pygame.K_DOWN)
+TURN_SECONDS = 0.6
+SECONDS = 8
+
+def segment_gaps(sim_rate, stage=1):
+    """Head-to-tail centre distances after every tick of the same scripted
+    run, with turns at the same game times whatever the tick rate."""
+    ticks = [0]
+    def script():
+        seconds = ticks[0] / sim_rate
+        ticks[0] += 1
+        return (TURNS[int(seconds / TURN_SECONDS) % len(TURNS)],)
+    game = Game(headless=True, seed=1, input_source=ScriptedInput(script=script),
+                sim_rate=sim_rate)
+    game.walls = []
+    game.wall_grid = WallGrid([])
+    game.enemies.clear()
+    game.player.update_speed(stage)
+    gaps = []
+    for _ in range(SECONDS * sim_rate):
+        game.update()
+        segments = game.player.segments
+        gaps.append([math.dist(a.center, b.center) for a, b in zip(segments, segments[1:])])
+    return gaps
+
+@pytest.mark.parametrize('stage', (1, 155))
+def test_segment_gaps_match_across_sim_rates(stage):
+    reference = segment_gaps(60, stage)
+    reference_max = max(map(max, reference))
+    reference_mean = sum(map(sum, reference)) / sum(map(len, reference))
+    for sim_rate in (120, 144):
+        gaps = segment_gaps(sim_rate, stage)
+        mean = sum(map(sum, gaps)) / sum(map(len, gaps))
+        assert max(map(max, gaps)) <= reference_max + 2, sim_rate
+        assert mean == pytest.approx(reference_mean, abs=1.5), sim_rate
@@ -25,8 +25,12 @@ async def main():
     
     # Import game after pygame init
     print("Importing game module...")
-    from caterpillar_world_saver.game import Game
-    game = Game()
+    from caterpillar_world_saver.game import Game, seed_from_args, sim_rate_from_args
+    from caterpillar_world_saver.replay import start_recording
+    game = Game(dirty_rects=True, seed=seed_from_args(),
+                sim_rate=sim_rate_from_args())
+    print(f"Seed: {game.seed}")
+    recorder = start_recording(game)
     
     # Main game loop
     running = True
@@ -47,22 +51,15 @@ async def main():
                     screen = pygame.display.set_mode((width, height), flags)
                 game.handle_event(event)
             
-            # Clear screen with black background
-            screen.fill((0, 0, 0))
-            
-            # Update and draw
-            if not game.paused and not game.game_over:
-                game.update()
+            # Run the simulation ticks due since the last frame, then draw
+            game.advance()
             game.draw()
             
-            # Basic rendering to confirm loop execution
-            pygame.draw.circle(screen, (255, 0, 0), (400, 300), 50)
-            
-            # Update display
-            pygame.display.flip()
+            # Update display (only the regions that changed)
+            game.present()
             
-            # Cap at 60 FPS
-            await asyncio.sleep(1/60)
+            # Cap at 60 FPS, less while paused or on game over
+            await asyncio.sleep(1/game.frame_rate())
             
             # Debug frame count
             frame_count += 1
@@ -73,6 +70,9 @@ async def main():
             print(f"Error in game loop: {e}")
             continue
 
+    if recorder is not None:
+        recorder.close()
+
 if __name__ == "__main__":
     print("Starting game...")
     asyncio.run(main())